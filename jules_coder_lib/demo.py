@@ -26,6 +26,43 @@ def test_jules_coder():
     # Check output type (should be real magnitudes)
     assert not torch.is_complex(logits), "Logits should be real-valued magnitudes."
 
+    # In-place residuals (no autograd) must match the out-of-place path
+    with torch.no_grad():
+        assert torch.allclose(model(input_ids), logits), "Inference path diverged from training path."
+
+    # Magnitude/phase views must reconstruct the stored complex embedding
+    print("Testing Harmonic Embedding magnitude/phase views...")
+    emb = model.embedding
+    assert torch.allclose(emb.magnitude, torch.ones_like(emb.magnitude), atol=1e-6), "Magnitude should initialize to 1."
+    reference = torch.polar(emb.magnitude[input_ids], emb.phase[input_ids])
+    assert torch.allclose(torch.complex(*emb(input_ids)), reference, atol=1e-6), "Magnitude/phase views diverged from the stored embedding."
+
+    # The gate's real-GEMM expansion must match the complex product Wz + b
+    print("Testing Interference Logic Gate linear map...")
+    gate = model.layers[0].ilg
+    x_re, x_im = emb(input_ids)
+    def gate_reference():
+        return torch.matmul(torch.complex(x_re, x_im), torch.complex(gate.W_re, gate.W_im)) + torch.complex(gate.b_re, gate.b_im)
+    with torch.no_grad():
+        expected = gate_reference()
+        split_re, split_im = gate._linear_split(x_re, x_im)
+        split = torch.complex(split_re + gate.b_re, split_im + gate.b_im)
+        assert torch.allclose(split, expected, atol=1e-4), "Split-GEMM layout diverged from the complex product."
+        assert torch.allclose(torch.complex(*gate.linear(x_re, x_im)), expected, atol=1e-4), "Gate linear map diverged from the complex product."
+        # The cached complex weight must follow in-place weight updates
+        gate.W_re.mul_(2)
+        assert torch.allclose(torch.complex(*gate.linear(x_re, x_im)), gate_reference(), atol=1e-4), "Stale complex weight cache."
+        gate.W_re.div_(2)
+
+    # ModReLU at z == 0 must give a zero output and exactly zero gradients
+    z_re = torch.zeros(3, requires_grad=True)
+    z_im = torch.zeros(3, requires_grad=True)
+    out_re, out_im = gate.complex_relu(z_re, z_im)
+    (out_re + out_im).sum().backward()
+    assert torch.all(out_re == 0) and torch.all(out_im == 0), "ModReLU should map z == 0 to 0."
+    assert torch.all(z_re.grad == 0) and torch.all(z_im.grad == 0), "ModReLU gradient at z == 0 should be 0."
+    assert gate.threshold.grad == 0, "ModReLU threshold gradient at z == 0 should be 0."
+
     # Test Binding
     print("Testing Holographic Binding...")
     binder = HolographicBinder()
@@ -36,6 +73,31 @@ def test_jules_coder():
     assert bound.shape == (dim,), f"Expected {(dim,)}, got {bound.shape}"
     assert torch.is_complex(bound), "Bound vector should be complex."
 
+    # Cached role spectra and real binding must agree with the plain path
+    roles = torch.randn(4, dim, dtype=torch.complex64)
+    fillers = torch.randn(4, dim, dtype=torch.complex64)
+    uncached = binder(roles, fillers)
+    binder.precompute_roles(roles)
+    assert torch.allclose(binder(roles, fillers), uncached, atol=1e-5), "Cached role spectrum diverged."
+    roles.mul_(2)
+    assert torch.allclose(binder(roles, fillers), 2 * uncached, atol=1e-5), "In-place role update served a stale spectrum."
+    roles.div_(2)
+    # Cached spectra must not outlive their role tensor, and can be cleared
+    transient = torch.randn(dim, dtype=torch.complex64)
+    binder.precompute_roles(transient)
+    del transient
+    assert len(binder.role_cache) == 1, "Cache entry outlived its role tensor."
+    binder.clear_roles()
+    assert not binder.role_cache, "clear_roles() should empty the cache."
+    pairwise = torch.stack([binder(r, f) for r, f in zip(roles, fillers)])
+    assert torch.allclose(uncached, pairwise, atol=1e-5), "Batched binding diverged from per-pair binding."
+    shared = torch.stack([binder(role, f) for f in fillers])
+    assert torch.allclose(binder(role, fillers), shared, atol=1e-5), "Broadcast role binding diverged."
+    assert binder(role, filler, n=128).shape == (128,), "Padded binding should have length n."
+    real_bound = binder.bind_real(roles.real, fillers.real)
+    assert not torch.is_complex(real_bound), "Real binding should stay real."
+    assert torch.allclose(real_bound, binder(roles.real, fillers.real).real, atol=1e-4), "Real binding diverged."
+
     print("All tests passed successfully!")
 
 if __name__ == "__main__":
@@ -1,7 +1,19 @@
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+import math
+import weakref
 import numpy as np
 import torch.fft as fft
+from typing import Tuple
+
+# Activations flow between layers as (real, imag) pairs of real tensors, so
+# every GEMM and elementwise op stays real; complex dtypes only appear at the
+# embedding table and the HolographicBinder (FFT) boundary.
+ComplexPair = Tuple[torch.Tensor, torch.Tensor]
+
+# Complex GEMMs are issued as real GEMMs so they can run on TF32 tensor cores.
+torch.backends.cuda.matmul.allow_tf32 = True
 
 class HarmonicEmbedding(nn.Module):
     def __init__(self, num_embeddings, embedding_dim):
@@ -9,38 +21,98 @@ class HarmonicEmbedding(nn.Module):
         self.embedding_dim = embedding_dim
 
         # Magnitude: Initialized to 1 (normalized energy)
-        # We learn 'presence' (r) separately from 'relation' (theta)
-        self.magnitude = nn.Parameter(torch.ones(num_embeddings, embedding_dim))
-
         # Phase: Initialized uniformly between -pi and pi
         # This creates the "superposition" potential
-        self.phase = nn.Parameter(
-            torch.rand(num_embeddings, embedding_dim) * 2 * np.pi - np.pi
+        # Stored directly as z = r * e^(i*theta) so the forward is a plain gather.
+        self.weight = nn.Parameter(
+            torch.polar(
+                torch.ones(num_embeddings, embedding_dim),
+                torch.rand(num_embeddings, embedding_dim) * 2 * np.pi - np.pi,
+            )
         )
 
-    def forward(self, indices):
-        mag = self.magnitude[indices]
-        pha = self.phase[indices]
+    @property
+    def magnitude(self):
+        """'Presence' (r) of each embedding, derived on demand."""
+        return torch.abs(self.weight)
 
-        # Euler's Formula: z = r * e^(i*theta)
-        # We use polar coordinates construction
-        real = mag * torch.cos(pha)
-        imag = mag * torch.sin(pha)
+    @property
+    def phase(self):
+        """'Relation' (theta) of each embedding, derived on demand."""
+        return torch.angle(self.weight)
 
-        return torch.complex(real, imag)
+    def forward(self, indices) -> ComplexPair:
+        z = self.weight[indices]
+        return z.real, z.imag
 
 class HolographicBinder(nn.Module):
     def __init__(self):
         super().__init__()
+        # Spectra of fixed role sets (structural templates), keyed by id(role).
+        # A weak reference to the role and its version counter are kept
+        # alongside, so a recycled id or an in-place update never hits, and an
+        # entry is evicted as soon as its role tensor is garbage collected.
+        self.role_cache = {}
+
+    def __getstate__(self):
+        # Weak references cannot be pickled; the cache is rebuilt on demand.
+        state = self.__dict__.copy()
+        state["role_cache"] = {}
+        return state
 
-    def bind(self, role_vector, filler_vector):
+    def precompute_roles(self, role_tensor):
+        """
+        Caches the spectrum of a fixed role vector or stack of roles [N, dim],
+        so repeated binds against it skip the role transform.
+        The spectrum is stored detached: binds served from the cache do not
+        backpropagate into the role. Learnable roles should not be precomputed.
+        """
+        f_role = fft.fft(role_tensor.detach().contiguous(), dim=-1)
+        key = id(role_tensor)
+        cache = self.role_cache
+
+        def _evict(ref):
+            entry = cache.get(key)
+            if entry is not None and entry[0] is ref:
+                del cache[key]
+
+        cache[key] = (weakref.ref(role_tensor, _evict), role_tensor._version, f_role)
+        return f_role
+
+    def clear_roles(self):
+        """Drops every precomputed role spectrum."""
+        self.role_cache.clear()
+
+    def _cached_spectrum(self, role_vector):
+        cached = self.role_cache.get(id(role_vector))
+        if cached is not None and cached[0]() is role_vector and cached[1] == role_vector._version:
+            return cached[2]
+        return None
+
+    def bind(self, role_vector, filler_vector, n=None):
         """
         Binds a role (e.g., 'Function Name') to a filler (e.g., 'main').
         Operation: Circular Convolution via FFT.
+        Accepts [dim] or stacked [..., dim] pairs; transforms run along the last dim.
+        n zero-pads the transform length (e.g. to a power of two for radix-2
+        kernels); the binding is then circular over n instead of dim.
         """
         # 1. Fourier Transform
-        f_role = fft.fft(role_vector)
-        f_filler = fft.fft(filler_vector)
+        # Same-shaped roles and fillers go through a single batched FFT call,
+        # unless the role spectrum was precomputed. Differently shaped inputs
+        # (e.g. one role [dim] against fillers [N, dim]) are transformed at
+        # their own shapes and only the spectra broadcast in the product.
+        # Inputs are transformed from contiguous memory (stack is always
+        # contiguous), so the FFT plan cache, keyed on shape/stride/dtype/device,
+        # keeps hitting the same plan.
+        f_role = self._cached_spectrum(role_vector)
+        if f_role is not None and (n is None or f_role.shape[-1] == n):
+            f_filler = fft.fft(filler_vector.contiguous(), n=n, dim=-1)
+        elif role_vector.shape == filler_vector.shape:
+            f_role, f_filler = fft.fft(torch.stack([role_vector, filler_vector]), n=n, dim=-1)
+        else:
+            f_role = fft.fft(role_vector.contiguous(), n=n, dim=-1)
+            f_filler = fft.fft(filler_vector.contiguous(), n=n, dim=-1)
 
         # 2. Element-wise Multiplication (Binding in Freq Domain)
         # This is where the 'Holographic' mixing occurs.
@@ -48,71 +120,171 @@ class HolographicBinder(nn.Module):
         f_bound = f_role * f_filler
 
         # 3. Inverse Fourier Transform
-        bound_vector = fft.ifft(f_bound)
+        bound_vector = fft.ifft(f_bound, dim=-1)
 
         # Note: In pure Harmonic Field, we typically keep it complex.
         return bound_vector
 
-    def forward(self, role_vector, filler_vector):
-        return self.bind(role_vector, filler_vector)
+    def bind_real(self, role_vector, filler_vector):
+        """
+        Circular Convolution for real roles/fillers (e.g. real symbol embeddings).
+        rfft keeps only the non-redundant half of the spectrum.
+        """
+        dim = role_vector.shape[-1]
+        f_bound = fft.rfft(role_vector.contiguous(), dim=-1) * fft.rfft(filler_vector.contiguous(), dim=-1)
+        return fft.irfft(f_bound, n=dim, dim=-1)
+
+    def forward(self, role_vector, filler_vector, n=None):
+        return self.bind(role_vector, filler_vector, n=n)
 
 class InterferenceLogicGate(nn.Module):
     def __init__(self, dim):
         super().__init__()
-        # Complex Linear Weights
-        self.weight = nn.Parameter(torch.randn(dim, dim, dtype=torch.complex64))
-        self.bias = nn.Parameter(torch.randn(dim, dtype=torch.complex64))
+        # Complex Linear Weights, stored as real and imaginary planes.
+        # Scaled so W_re + i*W_im matches torch.randn(..., dtype=complex64).
+        self.W_re = nn.Parameter(torch.randn(dim, dim) * 2 ** -0.5)
+        self.W_im = nn.Parameter(torch.randn(dim, dim) * 2 ** -0.5)
+        self.b_re = nn.Parameter(torch.randn(dim) * 2 ** -0.5)
+        self.b_im = nn.Parameter(torch.randn(dim) * 2 ** -0.5)
 
         # Phase-Preserving Activation (ModReLU)
         self.threshold = nn.Parameter(torch.tensor(0.5))
 
-    def complex_relu(self, z):
+        # W_re + i*W_im for the off-CUDA path, rebuilt when either plane
+        # changes (in-place updates bump _version; .to() swaps storage).
+        self._complex_weight_cache = None
+
+    def complex_relu(self, z_re, z_im) -> ComplexPair:
         """
         ModReLU: Rectifies magnitude, preserves phase.
         logic: if |z| + b > 0 then (|z|+b) * z/|z| else 0
+        Rescales z directly instead of a polar round-trip; matches the
+        polar form everywhere except |z| == 0, which now maps to 0.
+        At |z| == 0 (below 1e-8) the scale is zeroed, so both the output and
+        its gradient are exactly 0 there, instead of NaN (hypot) or ~b/eps.
         """
-        mag = torch.abs(z)
-        phase = torch.angle(z)
+        sq_mag = z_re * z_re + z_im * z_im
+        nonzero = sq_mag > 1e-16
+        # Degenerate entries take sqrt(1) so neither branch of the where below
+        # produces inf/NaN that would leak through its backward.
+        mag = torch.sqrt(torch.where(nonzero, sq_mag, torch.ones_like(sq_mag)))
 
         # Logic Gate Thresholding
         # If interference is destructive (cancellation), mag drops below threshold.
         # This forces the output to 0, implementing the 'False' state of the gate.
-        activated_mag = torch.relu(mag + self.threshold)
+        scale = torch.where(nonzero, torch.relu(mag + self.threshold) / mag, torch.zeros_like(mag))
+
+        return scale * z_re, scale * z_im
+
+    def _complex_weight(self):
+        W_re, W_im = self.W_re, self.W_im
+        if torch.is_grad_enabled() and (W_re.requires_grad or W_im.requires_grad):
+            # A cached weight would carry one step's autograd graph into the next.
+            return torch.complex(W_re, W_im)
+        state = (W_re.data_ptr(), W_im.data_ptr(), W_re._version, W_im._version)
+        cached = self._complex_weight_cache
+        if cached is None or cached[0] is not W_re or cached[1] is not W_im or cached[2] != state:
+            cached = (W_re, W_im, state, torch.complex(W_re, W_im))
+            self._complex_weight_cache = cached
+        return cached[3]
+
+    def _linear_split(self, x_re, x_im) -> ComplexPair:
+        # Re = x_re @ W_re - x_im @ W_im, Im = x_re @ W_im + x_im @ W_re
+        # On CUDA the GEMMs always run in BF16 on tensor cores (FP32 accumulate).
+        # Parameters are hoisted to locals: each is read twice per call.
+        W_re, W_im = self.W_re, self.W_im
+        with torch.autocast("cuda", dtype=torch.bfloat16, enabled=x_re.is_cuda):
+            out_re = torch.matmul(x_re, W_re) - torch.matmul(x_im, W_im)
+            out_im = torch.matmul(x_re, W_im) + torch.matmul(x_im, W_re)
+        return out_re.float(), out_im.float()
+
+    def _linear_native(self, x_re, x_im) -> ComplexPair:
+        # Without tensor cores the native complex GEMM is faster than the split.
+        out = torch.matmul(torch.complex(x_re, x_im), self._complex_weight())
+        return out.real, out.imag
 
-        return activated_mag * torch.exp(1j * phase)
+    def linear(self, x_re, x_im) -> ComplexPair:
+        """
+        Complex Linear Transformation (Rotation + Scaling): Wz + b.
+        On CUDA: four real BF16 GEMMs. Elsewhere: one FP32 complex GEMM.
+        The choice depends on the device only, never on the input size.
+        """
+        if x_re.is_cuda:
+            out_re, out_im = self._linear_split(x_re, x_im)
+        else:
+            out_re, out_im = self._linear_native(x_re, x_im)
+        return out_re + self.b_re, out_im + self.b_im
 
-    def forward(self, z_input):
+    def forward(self, x_re, x_im) -> ComplexPair:
         # 1. Complex Linear Transformation (Rotation + Scaling)
-        # Wz + b
-        linear_out = torch.matmul(z_input, self.weight) + self.bias
+        out_re, out_im = self.linear(x_re, x_im)
 
         # 2. Interference Activation
         # This is where the 'Computation' happens.
-        return self.complex_relu(linear_out)
+        return self.complex_relu(out_re, out_im)
+
+def _complex_linear(real, imag, x_re, x_im):
+    """
+    Applies the complex Linear (real + i*imag) to x_re + i*x_im.
+    Four real GEMMs; the bias pair (b_r - b_i, b_r + b_i) spans any complex bias.
+    """
+    out_re = real(x_re) - imag(x_im)
+    out_im = real(x_im) + imag(x_re)
+    return out_re, out_im
+
+def _init_complex_pair(real, imag):
+    """
+    Initializes the complex weight real + i*imag with nn.Linear's Kaiming
+    magnitude and a uniform phase in [-pi, pi], so |w| keeps the real-Linear
+    variance instead of doubling it across both parts.
+    """
+    nn.init.kaiming_uniform_(real.weight, a=math.sqrt(5))
+    with torch.no_grad():
+        w = torch.polar(real.weight.abs(), torch.rand_like(real.weight) * 2 * np.pi - np.pi)
+        real.weight.copy_(w.real)
+        imag.weight.copy_(w.imag)
 
 class TeleportationAttention(nn.Module):
     def __init__(self, dim, beta=1.0):
         super().__init__()
-        self.beta = beta # Inverse Temperature (Control parameter for Ignition)
-        # Using Complex Linear Layers
-        self.q_proj = nn.Linear(dim, dim, dtype=torch.complex64)
-        self.k_proj = nn.Linear(dim, dim, dtype=torch.complex64)
-        self.v_proj = nn.Linear(dim, dim, dtype=torch.complex64)
+        # Inverse Temperature (Control parameter for Ignition)
+        # Kept a Python float: passed straight to SDPA's scale, and under
+        # torch.compile it specializes as a constant instead of a runtime tensor.
+        self.beta = float(beta)
+        # Complex Linear Layers, split into real and imaginary parts
+        self.qr, self.qi = nn.Linear(dim, dim), nn.Linear(dim, dim)
+        self.kr, self.ki = nn.Linear(dim, dim), nn.Linear(dim, dim)
+        self.vr, self.vi = nn.Linear(dim, dim), nn.Linear(dim, dim)
+        for real, imag in ((self.qr, self.qi), (self.kr, self.ki), (self.vr, self.vi)):
+            _init_complex_pair(real, imag)
 
-    def forward(self, x):
-        Q = self.q_proj(x)
-        K = self.k_proj(x)
-        V = self.v_proj(x)
+    def forward(self, x_re, x_im) -> ComplexPair:
+        # Hoist module attributes to locals (cheaper than nn.Module.__getattr__)
+        qr, qi, kr, ki, vr, vi, beta = self.qr, self.qi, self.kr, self.ki, self.vr, self.vi, self.beta
+        Qr, Qi = _complex_linear(qr, qi, x_re, x_im)
+        Kr, Ki = _complex_linear(kr, ki, x_re, x_im)
+        Vr, Vi = _complex_linear(vr, vi, x_re, x_im)
 
         # Energy Function: E = -Re(Q * K_conjugate)
         # Measures alignment in the Semantic Hilbert Space
-        energy = -torch.real(torch.matmul(Q, K.conj().transpose(-2, -1)))
+        # Re(Q K^H) = Qr Kr^T + Qi Ki^T, i.e. a real dot product over [Qr | Qi]
+        # and [Kr | Ki], so softmax(-beta * E) is exactly scaled dot-product
+        # attention with scale=beta and runs as a single fused kernel.
+        # The conjugate of K is the sign flip on Ki, already folded into the
+        # '+' above, and the transpose is left to SDPA, so no conj() or
+        # transposed copy of K is ever materialized.
 
         # Ignition / Teleportation
         # As Beta increases, the distribution sharpens drastically (Collapse).
         # This simulates the 'Winner-Take-All' dynamic of Global Workspace Ignition.
-        attn_weights = torch.softmax(-self.beta * energy, dim=-1)
-
-        # Broadcast
-        out = torch.matmul(attn_weights.type(torch.complex64), V)
-        return out
+        # Broadcast: V is carried as [Vr | Vi] and reweighted in the same
+        # kernel, so the real-valued weights never get upcast to complex and
+        # each half of the output keeps unit inner stride.
+        dim = Vr.shape[-1]
+        out = F.scaled_dot_product_attention(
+            torch.cat([Qr, Qi], dim=-1),
+            torch.cat([Kr, Ki], dim=-1),
+            torch.cat([Vr, Vi], dim=-1),
+            scale=beta,
+        )
+        return out[..., :dim], out[..., dim:]
@@ -1,31 +1,55 @@
 import torch
 import torch.nn as nn
-from .layers import HarmonicEmbedding, TeleportationAttention, InterferenceLogicGate, HolographicBinder
+from torch.utils.checkpoint import checkpoint
+from .layers import ComplexPair, HarmonicEmbedding, TeleportationAttention, InterferenceLogicGate, HolographicBinder
+from .layers import _complex_linear, _init_complex_pair
 
 class HarmonicBlock(nn.Module):
-    def __init__(self, dim, beta=1.0):
+    def __init__(self, dim, beta=1.0, use_checkpoint=False):
         super().__init__()
         self.attn = TeleportationAttention(dim, beta=beta)
         self.ilg = InterferenceLogicGate(dim)
+        # Recompute the block in backward instead of storing its activations.
+        self.use_checkpoint = use_checkpoint
+
+    def forward(self, x: ComplexPair) -> ComplexPair:
+        # Takes the pair as one argument so blocks chain in nn.Sequential.
+        if self.use_checkpoint and self.training and torch.is_grad_enabled():
+            return checkpoint(self._forward, x, use_reentrant=False)
+        return self._forward(x)
+
+    @staticmethod
+    def _residual(x, update):
+        # Without autograd the update is a fresh tensor nobody else holds,
+        # so accumulate into it rather than allocating another [B, S, D].
+        if update.requires_grad:
+            return x + update
+        return update.add_(x)
+
+    def _forward(self, x: ComplexPair) -> ComplexPair:
+        x_re, x_im = x
+        residual = self._residual
 
-    def forward(self, x):
         # Attention
-        attn_out = self.attn(x)
+        attn_re, attn_im = self.attn(x_re, x_im)
         # Residual connection is standard in transformers, though not explicitly mentioned,
         # it is usually implied for deep networks. I will add it for stability.
-        x = x + attn_out
+        x_re = residual(x_re, attn_re)
+        x_im = residual(x_im, attn_im)
 
         # Interference Logic Gate (FFN equivalent)
-        ilg_out = self.ilg(x)
-        x = x + ilg_out
+        ilg_re, ilg_im = self.ilg(x_re, x_im)
+        x_re = residual(x_re, ilg_re)
+        x_im = residual(x_im, ilg_im)
 
-        return x
+        return x_re, x_im
 
 class JulesCoderModel(nn.Module):
-    def __init__(self, vocab_size, dim, depth=4, beta=1.0):
+    def __init__(self, vocab_size, dim, depth=4, beta=1.0, compile=False, logits_sqrt=False, use_checkpoint=False):
         super().__init__()
         self.embedding = HarmonicEmbedding(vocab_size, dim)
-        self.layers = nn.ModuleList([HarmonicBlock(dim, beta=beta) for _ in range(depth)])
+        # A static chain, so compile/graph capture sees the whole depth at once.
+        self.layers = nn.Sequential(*[HarmonicBlock(dim, beta=beta, use_checkpoint=use_checkpoint) for _ in range(depth)])
         self.binder = HolographicBinder() # Available for structural binding tasks
 
         # Final projection to vocab? The text doesn't specify the output head.
@@ -33,19 +57,39 @@ class JulesCoderModel(nn.Module):
         # Since we are in complex space, we probably need a complex-to-real projection or magnitude check.
         # "The system "teleports" (collapses) into the deepest basin—the most coherent interpretation"
         # I will implement a simple projection for now to complete the loop.
-        self.output_head = nn.Linear(dim, vocab_size, dtype=torch.complex64)
+        # The head is a complex projection held as real/imaginary Linears (real
+        # GEMMs, BF16 on CUDA); the logit is the energy |Wx + b|^2.
+        # FP16/BF16 tensor-core GEMMs need dims that are multiples of 8, else they
+        # fall back to CUDA cores, so the vocab dim is padded and sliced off in forward.
+        self.vocab_size = vocab_size
+        self._padded_vocab = ((vocab_size + 7) // 8) * 8
+        self.output_head_r = nn.Linear(dim, self._padded_vocab)
+        self.output_head_i = nn.Linear(dim, self._padded_vocab)
+        _init_complex_pair(self.output_head_r, self.output_head_i)
+        # Return magnitudes (sqrt of the energy) instead of the squared form.
+        self.logits_sqrt = logits_sqrt
+
+        if compile:
+            # Fuses the elementwise (real-pair) ops and, on CUDA, captures the depth
+            # loop in a CUDA graph. The binder (FFT) is not on this path.
+            # nn.Module.compile keeps the wrapper per module, so deepcopy and
+            # torch.save see the copy's own parameters instead of a bound method.
+            self.compile(mode="reduce-overhead", fullgraph=True, dynamic=False)
 
     def forward(self, input_ids):
         # input_ids: [Batch, Seq]
-        x = self.embedding(input_ids)
-
-        for layer in self.layers:
-            x = layer(x)
+        x_re, x_im = self.layers(self.embedding(input_ids))
 
-        logits_complex = self.output_head(x)
-        # Taking magnitude for probability/logit
-        logits = torch.abs(logits_complex)
+        # The vocab projection is the largest GEMM per step
+        with torch.autocast("cuda", dtype=torch.bfloat16, enabled=x_re.is_cuda):
+            out_r, out_i = _complex_linear(self.output_head_r, self.output_head_i, x_re, x_im)
+        out_r = out_r[..., :self.vocab_size].float()
+        out_i = out_i[..., :self.vocab_size].float()
+        # Squared magnitude for probability/logit: monotone in |.|, no sqrt
+        logits = out_r * out_r + out_i * out_i
+        if self.logits_sqrt:
+            logits = torch.sqrt(logits)
         return logits
 
-    def bind_structure(self, role_vec, filler_vec):
-        return self.binder(role_vec, filler_vec)
+    def bind_structure(self, role_vec, filler_vec, n=None):
+        return self.binder(role_vec, filler_vec, n=n)